@@ -6,11 +6,19 @@ with support for both single file and batch directory processing.
 """
 
 import asyncio
+import base64
+import binascii
 import logging
 import argparse
+import os
+import stat
+from functools import partial
+from io import BytesIO
 from pathlib import Path
-from typing import Any
+from typing import Any, Generator
 
+import PIL
+from PIL import Image, features
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.server.sse import SseServerTransport
@@ -22,11 +30,15 @@ import uvicorn
 # Import from src package
 from src import (
     convert_one,
-    convert_batch_parallel,
+    convert_bytes,
+    iter_convert_batch,
+    run_in_pool,
+    shutdown_pools,
     validate_path,
     validate_params,
     ValidationError,
 )
+from src.core import AVIF_CODEC
 from src.presets import get_preset
 
 # Setup logging
@@ -40,13 +52,75 @@ logger = logging.getLogger(__name__)
 app = Server("image-convert-mcp")
 
 
-@app.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available MCP tools."""
-    return [
-        Tool(
-            name="convert_image_single",
-            description="""Convert a single image to WebP and/or AVIF format.
+# Appended to results whose up-to-date outputs were kept as-is
+SKIPPED_HINT = "pass overwrite=true to apply new settings"
+
+
+# Tool arguments shared by the single and batch tools
+COMMON_PROPERTIES: dict[str, Any] = {
+    "preset": {
+        "type": "string",
+        "enum": ["web", "thumbnail", "social", "hd", "4k", "archive", "lossless", "max-compression"],
+        "description": "Use a preset configuration. Presets: web (1920px), thumbnail (300x300), social (1200x630), hd (1920x1080), 4k (3840x2160), archive (high quality), lossless, max-compression"
+    },
+    "output_dir": {
+        "type": "string",
+        "description": "Directory for output files (default: same as input)"
+    },
+    "format": {
+        "type": "string",
+        "enum": ["webp", "avif", "both"],
+        "description": "Output format (default: both)"
+    },
+    "webp_quality": {
+        "type": "integer",
+        "minimum": 1,
+        "maximum": 100,
+        "description": "WebP quality 1-100 (default: 80)"
+    },
+    "avif_quality": {
+        "type": "integer",
+        "minimum": 1,
+        "maximum": 100,
+        "description": "AVIF quality 1-100 (default: 50)"
+    },
+    "lossless": {
+        "type": "boolean",
+        "description": "Enable lossless compression for WebP (default: false)"
+    },
+    "webp_method": {
+        "type": "integer",
+        "minimum": 0,
+        "maximum": 6,
+        "description": "WebP encoder effort 0-6 (default: 4). 6 is ~3x slower for ~1% smaller files"
+    },
+    "avif_codec": {
+        "type": "string",
+        "enum": ["auto", "aom", "svt", "rav1e"],
+        "description": "AV1 encoder (default: svt when available, else auto). SVT-AV1 is several times faster than aom at similar quality"
+    },
+    "high_quality": {
+        "type": "boolean",
+        "description": "Favor compression over speed: webp_method=6, avif_speed=4 unless set explicitly (default: false)"
+    },
+    "max_width": {
+        "type": "integer",
+        "description": "Maximum output width (maintains aspect ratio)"
+    },
+    "max_height": {
+        "type": "integer",
+        "description": "Maximum output height (maintains aspect ratio)"
+    },
+    "overwrite": {
+        "type": "boolean",
+        "description": "Re-encode even if outputs are newer than the input. Without resize bounds, up-to-date outputs are skipped unless this is set; changed quality settings need it (default: false)"
+    },
+}
+
+TOOLS = [
+    Tool(
+        name="convert_image_single",
+        description="""Convert a single image to WebP and/or AVIF format.
 
 USE WHEN: Optimizing images for web, reducing file sizes, or converting 
 legacy formats (PNG/JPG/TIFF/BMP) to modern next-gen formats.
@@ -56,60 +130,39 @@ COMMON PATTERNS:
 • Maximum compression: format='avif', avif_quality=50
 • Thumbnails: max_width=300, max_height=300
 • Lossless archival: format='webp', lossless=True
+• In-memory conversion: input_bytes=<base64>, outputs returned as base64
+• Encode speed: AVIF dominates conversion time; each avif_speed step
+  up roughly halves it for slightly larger files (default 6)
 
 SUPPORTED INPUT: PNG, JPG, JPEG, TIFF, BMP, WebP""",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "input_path": {
-                        "type": "string",
-                        "description": "Path to the input image file"
-                    },
-                    "preset": {
-                        "type": "string",
-                        "enum": ["web", "thumbnail", "social", "hd", "4k", "archive", "lossless", "max-compression"],
-                        "description": "Use a preset configuration. Presets: web (1920px), thumbnail (300x300), social (1200x630), hd (1920x1080), 4k (3840x2160), archive (high quality), lossless, max-compression"
-                    },
-                    "output_dir": {
-                        "type": "string",
-                        "description": "Directory for output files (default: same as input)"
-                    },
-                    "format": {
-                        "type": "string",
-                        "enum": ["webp", "avif", "both"],
-                        "description": "Output format (default: both)"
-                    },
-                    "webp_quality": {
-                        "type": "integer",
-                        "minimum": 1,
-                        "maximum": 100,
-                        "description": "WebP quality 1-100 (default: 80)"
-                    },
-                    "avif_quality": {
-                        "type": "integer",
-                        "minimum": 1,
-                        "maximum": 100,
-                        "description": "AVIF quality 1-100 (default: 50)"
-                    },
-                    "lossless": {
-                        "type": "boolean",
-                        "description": "Enable lossless compression for WebP (default: false)"
-                    },
-                    "max_width": {
-                        "type": "integer",
-                        "description": "Maximum output width (maintains aspect ratio)"
-                    },
-                    "max_height": {
-                        "type": "integer",
-                        "description": "Maximum output height (maintains aspect ratio)"
-                    }
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "input_path": {
+                    "type": "string",
+                    "description": "Path to the input image file"
                 },
-                "required": ["input_path"]
-            }
-        ),
-        Tool(
-            name="convert_image_batch",
-            description="""Convert multiple images in a directory to WebP and/or AVIF format.
+                "input_bytes": {
+                    "type": "string",
+                    "description": "Base64-encoded input image, used instead of input_path. Outputs are returned base64-encoded and nothing is written to disk"
+                },
+                **COMMON_PROPERTIES,
+                "avif_speed": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "maximum": 10,
+                    "description": "AVIF encoder speed 0-10 (default: 6). Lower is slower with smaller files"
+                },
+            },
+            "anyOf": [
+                {"required": ["input_path"]},
+                {"required": ["input_bytes"]}
+            ]
+        }
+    ),
+    Tool(
+        name="convert_image_batch",
+        description="""Convert multiple images in a directory to WebP and/or AVIF format.
 
 USE WHEN: Processing all images in a folder, bulk optimization, or 
 converting entire image libraries at once.
@@ -121,62 +174,118 @@ COMMON PATTERNS:
 • Batch web optimization: format='webp', webp_quality=80, workers=4
 • Create thumbnail directory: max_width=300, max_height=300
 • Full archive conversion: format='both', workers=8
+• Encode speed: AVIF dominates conversion time; batch defaults to
+  avif_speed=8, use avif_speed=4 or high_quality=True for smaller files
 
 SUPPORTED INPUT: PNG, JPG, JPEG, TIFF, BMP, WebP files in directory""",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "input_path": {
-                        "type": "string",
-                        "description": "Path to directory containing images"
-                    },
-                    "preset": {
-                        "type": "string",
-                        "enum": ["web", "thumbnail", "social", "hd", "4k", "archive", "lossless", "max-compression"],
-                        "description": "Use a preset configuration. Presets: web (1920px), thumbnail (300x300), social (1200x630), hd (1920x1080), 4k (3840x2160), archive (high quality), lossless, max-compression"
-                    },
-                    "output_dir": {
-                        "type": "string",
-                        "description": "Directory for output files (default: same as input)"
-                    },
-                    "format": {
-                        "type": "string",
-                        "enum": ["webp", "avif", "both"],
-                        "description": "Output format (default: both)"
-                    },
-                    "webp_quality": {
-                        "type": "integer",
-                        "minimum": 1,
-                        "maximum": 100,
-                        "description": "WebP quality 1-100 (default: 80)"
-                    },
-                    "avif_quality": {
-                        "type": "integer",
-                        "minimum": 1,
-                        "maximum": 100,
-                        "description": "AVIF quality 1-100 (default: 50)"
-                    },
-                    "lossless": {
-                        "type": "boolean",
-                        "description": "Enable lossless compression for WebP (default: false)"
-                    },
-                    "max_width": {
-                        "type": "integer",
-                        "description": "Maximum output width (maintains aspect ratio)"
-                    },
-                    "max_height": {
-                        "type": "integer",
-                        "description": "Maximum output height (maintains aspect ratio)"
-                    },
-                    "workers": {
-                        "type": "integer",
-                        "description": "Number of parallel workers (default: CPU count)"
-                    }
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "input_path": {
+                    "type": "string",
+                    "description": "Path to directory containing images"
                 },
-                "required": ["input_path"]
-            }
-        )
-    ]
+                **COMMON_PROPERTIES,
+                "avif_speed": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "maximum": 10,
+                    "description": "AVIF encoder speed 0-10 (default: 8 for batch). Lower is slower with smaller files; 8 trades a few percent of size for several times the throughput"
+                },
+                "workers": {
+                    "type": "integer",
+                    "description": "Number of parallel workers (default: CPU count)"
+                }
+            },
+            "required": ["input_path"]
+        }
+    ),
+]
+
+
+@app.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available MCP tools."""
+    return TOOLS
+
+
+def prepare_paths(arguments: dict[str, Any]) -> tuple[Path, os.stat_result, Path]:
+    """
+    Validate the tool's input path and create its output directory.
+    
+    A single stat serves the existence, file/directory and size checks.
+    
+    Returns:
+        Tuple of (input path, input stat result, output directory)
+    """
+    input_path = validate_path(Path(arguments["input_path"]), must_exist=False)
+    try:
+        input_stat = input_path.stat()
+    except FileNotFoundError:
+        raise ValidationError(f"Path does not exist: {arguments['input_path']}")
+    output_dir = Path(arguments.get("output_dir", input_path.parent))
+    output_dir = validate_path(output_dir, must_exist=False)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return input_path, input_stat, output_dir
+
+
+async def run_batch(
+    input_dir: Path,
+    workers: int | None,
+    **kwargs: Any
+) -> tuple[int, int, list[dict[str, Any]]]:
+    """
+    Run a batch conversion, streaming per-image progress to the client.
+    
+    Results are consumed as they complete and only failures are kept, so
+    memory stays flat regardless of batch size.
+    
+    Returns:
+        Tuple of (images processed, images with up-to-date outputs left
+        as-is, failed results)
+    """
+    ctx = app.request_context
+    progress_token = ctx.meta.progressToken if ctx.meta else None
+    results = iter_convert_batch(input_dir, workers, **kwargs)
+    processed = 0
+    skipped = 0
+    failures = []
+    pending: asyncio.Future | None = None
+    try:
+        while True:
+            # Shielded so that on cancellation the task still tracks when
+            # the in-flight next() actually returns in its thread
+            pending = asyncio.ensure_future(asyncio.to_thread(next, results, None))
+            result = await asyncio.shield(pending)
+            if result is None:
+                break
+            processed += 1
+            if "error" in result:
+                failures.append(result)
+            elif "skipped" in result:
+                skipped += 1
+            if progress_token is not None:
+                await ctx.session.send_progress_notification(
+                    progress_token, processed, message=result["input"]
+                )
+    finally:
+        if pending is None or pending.done():
+            results.close()
+        else:
+            # Cancelled while next() runs in a worker thread; the generator
+            # cannot be closed until that call returns
+            pending.add_done_callback(partial(_close_batch, results))
+    return processed, skipped, failures
+
+
+def _close_batch(
+    results: Generator[dict[str, Any], None, None],
+    pending: asyncio.Future,
+) -> None:
+    """Close an abandoned batch once its in-flight next() call has returned."""
+    if not pending.cancelled() and pending.exception() is not None:
+        logger.error(f"Cancelled batch failed: {pending.exception()}")
+    results.close()
 
 
 @app.call_tool()
@@ -186,59 +295,105 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         # Validate parameters
         validate_params(arguments)
         
-        # Validate and resolve paths
-        input_path = validate_path(Path(arguments["input_path"]), must_exist=True)
-        output_dir = Path(arguments.get("output_dir", input_path.parent))
-        output_dir = validate_path(output_dir, must_exist=False)
-        output_dir.mkdir(parents=True, exist_ok=True)
-
         # Apply preset if specified
         preset_name = arguments.get("preset")
         if preset_name:
             preset_config = get_preset(preset_name)
-            logger.info(f"Using preset '{preset_name}': {preset_config}")
+            logger.info(f"Using preset '{preset_name}': {dict(preset_config)}")
         else:
             preset_config = {}
         
-        # Common conversion arguments (preset values are overridden by explicit args)
-        common_args = {
-            "output_dir": output_dir,
+        # high_quality restores the slowest/smallest encoder settings; batch
+        # jobs otherwise default to a faster AVIF speed for throughput
+        high_quality = arguments.get("high_quality", False)
+        default_avif_speed = 8 if name == "convert_image_batch" else 6
+        
+        # Encoder arguments (preset values are overridden by explicit args)
+        encode_args = {
             "format": arguments.get("format", preset_config.get("format", "both")),
             "webp_quality": arguments.get("webp_quality", preset_config.get("webp_quality", 80)),
             "avif_quality": arguments.get("avif_quality", preset_config.get("avif_quality", 50)),
             "lossless": arguments.get("lossless", preset_config.get("lossless", False)),
             "max_width": arguments.get("max_width", preset_config.get("max_width")),
             "max_height": arguments.get("max_height", preset_config.get("max_height")),
+            "webp_method": arguments.get("webp_method", 6 if high_quality else 4),
+            "avif_speed": arguments.get(
+                "avif_speed",
+                preset_config.get("avif_speed", 4 if high_quality else default_avif_speed),
+            ),
+            "avif_codec": arguments.get("avif_codec"),
+        }
+        
+        # In-memory conversion: decode the upload and return encoded bytes
+        if "input_path" not in arguments:
+            if name != "convert_image_single":
+                raise ValidationError("Batch mode requires a directory path")
+            try:
+                data = base64.b64decode(arguments["input_bytes"], validate=True)
+            except (binascii.Error, TypeError) as e:
+                raise ValidationError(f"input_bytes is not valid base64: {e}")
+            
+            outputs = await run_in_pool(convert_bytes, data, **encode_args)
+            result = {
+                fmt: base64.b64encode(buf).decode("ascii")
+                for fmt, buf in outputs.items()
+            }
+            return [TextContent(
+                type="text",
+                text=f"✅ Image conversion successful:\n{result}"
+            )]
+        
+        # Validate and resolve paths
+        # Path checks can block on slow (e.g. network) filesystems
+        input_path, input_stat, output_dir = await asyncio.to_thread(
+            prepare_paths, arguments
+        )
+        
+        common_args = {
+            "output_dir": output_dir,
+            "overwrite": arguments.get("overwrite", False),
+            **encode_args,
         }
 
         if name == "convert_image_batch":
-            if not input_path.is_dir():
+            if not stat.S_ISDIR(input_stat.st_mode):
                 raise ValidationError("Batch mode requires a directory path")
             
-            result = await asyncio.to_thread(
-                convert_batch_parallel,
-                input_dir=input_path,
-                workers=arguments.get("workers"),
+            processed, skipped, failures = await run_batch(
+                input_path,
+                arguments.get("workers"),
                 **common_args
             )
-            return [TextContent(
-                type="text",
-                text=f"✅ Batch conversion complete: {len(result)} images processed\n{result}"
-            )]
+            text = (
+                f"✅ Batch conversion complete: {processed} images processed, "
+                f"{len(failures)} failed\nOutput directory: {output_dir}"
+            )
+            if skipped:
+                text += (
+                    f"\n⚠️ {skipped} images already up to date were not re-encoded; "
+                    f"{SKIPPED_HINT}"
+                )
+            if failures:
+                text += f"\n{failures}"
+            return [TextContent(type="text", text=text)]
             
         elif name == "convert_image_single":
-            if not input_path.is_file():
+            if not stat.S_ISREG(input_stat.st_mode):
                 raise ValidationError("Single mode requires a file path")
             
-            result = await asyncio.to_thread(
+            result = await run_in_pool(
                 convert_one,
                 image_path=input_path,
+                size_bytes=input_stat.st_size,
                 **common_args
             )
-            return [TextContent(
-                type="text",
-                text=f"✅ Image conversion successful:\n{result}"
-            )]
+            text = f"✅ Image conversion successful:\n{result}"
+            if result.get("skipped"):
+                text += (
+                    f"\n⚠️ Already up to date, not re-encoded: "
+                    f"{', '.join(result['skipped'])}; {SKIPPED_HINT}"
+                )
+            return [TextContent(type="text", text=text)]
             
         raise ValueError(f"Unknown tool: {name}")
         
@@ -250,6 +405,23 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         return [TextContent(type="text", text=f"❌ Unexpected error: {str(e)}")]
 
 
+def _warmup() -> None:
+    """
+    Load the codec libraries before the first request arrives.
+    
+    Registers all Pillow plugins and runs a tiny WebP and AVIF encode, so
+    the first client request does not pay for library loading and encoder
+    table setup.
+    """
+    try:
+        Image.init()
+        img = Image.new("RGB", (16, 16))
+        img.save(BytesIO(), "WEBP", quality=80, method=0)
+        img.save(BytesIO(), "AVIF", quality=50, speed=10, codec=AVIF_CODEC)
+    except Exception as e:
+        logger.warning(f"Encoder warm-up failed: {e}")
+
+
 async def run_stdio():
     """Run MCP server with stdio transport."""
     async with stdio_server() as (r, w):
@@ -280,40 +452,61 @@ def main():
     )
     args = parser.parse_args()
 
-    if args.transport == "stdio":
-        logger.info("Starting MCP server with stdio transport")
-        asyncio.run(run_stdio())
-    else:
-        logger.info(f"Starting MCP server with SSE transport on {args.host}:{args.port}")
-        
-        # Use SseServerTransport with custom endpoint /mcp
-        sse = SseServerTransport(endpoint="/mcp")
-
-        async def handle_mcp(request):
-            """Handle SSE connection at /mcp endpoint."""
-            async with sse.connect_sse(
-                request.scope,
-                request.receive,
-                request._send
-            ) as (r, w):
-                await app.run(r, w, app.create_initialization_options())
-
-        async def handle_messages(request):
-            """Handle POST messages at /messages endpoint."""
-            await sse.handle_post_message(
-                request.scope,
-                request.receive,
-                request._send
-            )
+    # SVT-AV1 logs its configuration to stderr for every encode; keep errors only
+    os.environ.setdefault("SVT_LOG", "1")
 
-        starlette_app = Starlette(
-            routes=[
-                Route("/mcp", endpoint=handle_mcp, methods=["GET"]),
-                Route("/messages", endpoint=handle_messages, methods=["POST"]),
-            ]
-        )
-        
-        uvicorn.run(starlette_app, host=args.host, port=args.port)
+    # Pillow-SIMD builds report versions like "9.5.0.post1"
+    logger.info(f"Using Pillow {PIL.__version__}")
+    # libwebp picks SSE2/SSE4.1/AVX2 kernels at runtime; versions before 1.6
+    # have no AVX2 lossless paths
+    logger.info(
+        f"Codecs: libwebp {features.version('webp')}, "
+        f"libjpeg {features.version('jpg')} "
+        f"(turbo: {features.check_feature('libjpeg_turbo')}), "
+        f"AV1 encoder {AVIF_CODEC}"
+    )
+    _warmup()
+
+    try:
+        if args.transport == "stdio":
+            # The stdio transport reads and writes through worker threads, so
+            # the event loop is never the bottleneck; keep the default loop
+            logger.info("Starting MCP server with stdio transport")
+            asyncio.run(run_stdio())
+        else:
+            logger.info(f"Starting MCP server with SSE transport on {args.host}:{args.port}")
+            
+            # Use SseServerTransport with custom endpoint /mcp
+            sse = SseServerTransport(endpoint="/mcp")
+
+            async def handle_mcp(request):
+                """Handle SSE connection at /mcp endpoint."""
+                async with sse.connect_sse(
+                    request.scope,
+                    request.receive,
+                    request._send
+                ) as (r, w):
+                    await app.run(r, w, app.create_initialization_options())
+
+            async def handle_messages(request):
+                """Handle POST messages at /messages endpoint."""
+                await sse.handle_post_message(
+                    request.scope,
+                    request.receive,
+                    request._send
+                )
+
+            starlette_app = Starlette(
+                routes=[
+                    Route("/mcp", endpoint=handle_mcp, methods=["GET"]),
+                    Route("/messages", endpoint=handle_messages, methods=["POST"]),
+                ]
+            )
+            
+            uvicorn.run(starlette_app, host=args.host, port=args.port)
+    finally:
+        # Drop queued conversions; the interpreter's exit hook would run them
+        shutdown_pools()
 
 
 if __name__ == "__main__":
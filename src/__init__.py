@@ -4,66 +4,101 @@ Image Convert MCP - Core functionality.
 This package provides image conversion capabilities for WebP and AVIF formats.
 """
 
-from .core import (
-    load_image,
-    resize_if_needed,
-    convert_one,
-    convert_batch_parallel,
-    SUPPORTED_EXTS,
-)
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from .validation import (
-    validate_path,
-    validate_file_size,
-    validate_image_dimensions,
-    validate_params,
-    ValidationError,
-    ImageConversionError,
-    MAX_FILE_SIZE_MB,
-    MAX_DIMENSION,
-)
-
-from .presets import (
-    get_preset,
-    list_presets,
-    PRESETS,
-    PresetConfig,
-)
-
-from .stats import (
-    get_conversion_stats,
-    format_stats_summary,
-    calculate_savings,
-    format_size,
-)
-
-__all__ = [
+# Public name -> defining submodule. Submodules are imported on first
+# attribute access (PEP 562), so importing only the validators or stats
+# helpers does not pull in the encoders and the codec plugins.
+_EXPORTS = {
     # Core functions
-    "load_image",
-    "resize_if_needed",
-    "convert_one",
-    "convert_batch_parallel",
-    "SUPPORTED_EXTS",
+    "load_image": "core",
+    "resize_if_needed": "core",
+    "convert_one": "core",
+    "convert_bytes": "core",
+    "convert_batch_parallel": "core",
+    "iter_convert_batch": "core",
+    "run_in_pool": "core",
+    "shutdown_pools": "core",
+    "SUPPORTED_EXTS": "core",
     # Validation functions
-    "validate_path",
-    "validate_file_size",
-    "validate_image_dimensions",
-    "validate_params",
+    "validate_path": "validation",
+    "validate_file_size": "validation",
+    "validate_image_dimensions": "validation",
+    "validate_params": "validation",
     # Exceptions
-    "ValidationError",
-    "ImageConversionError",
+    "ValidationError": "validation",
+    "ImageConversionError": "validation",
     # Constants
-    "MAX_FILE_SIZE_MB",
-    "MAX_DIMENSION",
+    "MAX_FILE_SIZE_MB": "validation",
+    "MAX_DIMENSION": "validation",
     # Presets
-    "get_preset",
-    "list_presets",
-    "PRESETS",
-    "PresetConfig",
+    "get_preset": "presets",
+    "list_presets": "presets",
+    "PRESETS": "presets",
+    "PresetConfig": "presets",
     # Stats
-    "get_conversion_stats",
-    "format_stats_summary",
-    "calculate_savings",
-    "format_size",
-]
+    "get_conversion_stats": "stats",
+    "format_stats_summary": "stats",
+    "calculate_savings": "stats",
+    "calculate_savings_raw": "stats",
+    "format_size": "stats",
+}
+
+
+if TYPE_CHECKING:
+    # Static imports for type checkers and IDEs; at runtime the names are
+    # resolved lazily by __getattr__ below
+    from .core import (  # noqa: F401
+        load_image,
+        resize_if_needed,
+        convert_one,
+        convert_bytes,
+        convert_batch_parallel,
+        iter_convert_batch,
+        run_in_pool,
+        shutdown_pools,
+        SUPPORTED_EXTS,
+    )
+    from .validation import (  # noqa: F401
+        validate_path,
+        validate_file_size,
+        validate_image_dimensions,
+        validate_params,
+        ValidationError,
+        ImageConversionError,
+        MAX_FILE_SIZE_MB,
+        MAX_DIMENSION,
+    )
+    from .presets import (  # noqa: F401
+        get_preset,
+        list_presets,
+        PRESETS,
+        PresetConfig,
+    )
+    from .stats import (  # noqa: F401
+        get_conversion_stats,
+        format_stats_summary,
+        calculate_savings,
+        calculate_savings_raw,
+        format_size,
+    )
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f".{module}", __name__), name)
+    # Cache on the package so later lookups skip this hook
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = list(_EXPORTS)
 
@@ -10,11 +10,12 @@ Usage:
 """
 
 import argparse
+import os
 import sys
 import logging
 from pathlib import Path
 
-from .core import convert_one, convert_batch_parallel
+from .core import convert_one, iter_convert_batch
 from .validation import validate_path, ValidationError
 from .presets import get_preset, list_presets, PRESETS
 from .stats import get_conversion_stats, format_stats_summary
@@ -93,6 +94,24 @@ Examples:
         help="Enable lossless WebP compression",
     )
     
+    parser.add_argument(
+        "--webp-method",
+        type=int,
+        choices=range(0, 7),
+        default=4,
+        metavar="N",
+        help="WebP encoder effort 0-6 (default: 4; 6 is ~3x slower for ~1%% smaller files)",
+    )
+    
+    parser.add_argument(
+        "--avif-speed",
+        type=int,
+        choices=range(0, 11),
+        default=6,
+        metavar="N",
+        help="AVIF encoder speed 0-10 (default: 6; each step down is slower for smaller files)",
+    )
+    
     parser.add_argument(
         "-W", "--max-width",
         type=int,
@@ -173,6 +192,8 @@ def convert_single(args: argparse.Namespace) -> int:
         "webp_quality": args.webp_quality,
         "avif_quality": args.avif_quality,
         "lossless": args.lossless,
+        "webp_method": args.webp_method,
+        "avif_speed": args.avif_speed,
         "max_width": args.max_width,
         "max_height": args.max_height,
     }
@@ -225,6 +246,8 @@ def convert_batch(args: argparse.Namespace) -> int:
         "webp_quality": args.webp_quality,
         "avif_quality": args.avif_quality,
         "lossless": args.lossless,
+        "webp_method": args.webp_method,
+        "avif_speed": args.avif_speed,
         "max_width": args.max_width,
         "max_height": args.max_height,
     }
@@ -239,22 +262,22 @@ def convert_batch(args: argparse.Namespace) -> int:
         kwargs["webp_quality"] = args.quality
         kwargs["avif_quality"] = args.quality
     
-    results = convert_batch_parallel(
-        input_dir=input_dir,
-        workers=args.workers,
-        **kwargs,
-    )
-    
-    success_count = sum(1 for r in results if "error" not in r)
-    error_count = len(results) - success_count
+    # Only failures are kept; successful results are counted as they stream in
+    success_count = 0
+    failures = []
+    for r in iter_convert_batch(input_dir=input_dir, workers=args.workers, **kwargs):
+        if "error" in r:
+            failures.append(r)
+        else:
+            success_count += 1
+    error_count = len(failures)
     
     print(f"✅ Batch conversion complete: {success_count} succeeded, {error_count} failed")
     
     if error_count > 0:
         print("\nFailed conversions:")
-        for r in results:
-            if "error" in r:
-                print(f"   ❌ {r['input']}: {r['error']}")
+        for r in failures:
+            print(f"   ❌ {r['input']}: {r['error']}")
     
     return 0 if error_count == 0 else 1
 
@@ -275,6 +298,8 @@ def main() -> int:
         return 1
     
     setup_logging(args.verbose)
+    # SVT-AV1 logs its configuration to stderr for every encode; keep errors only
+    os.environ.setdefault("SVT_LOG", "1")
     
     try:
         if args.batch:
@@ -5,44 +5,257 @@ This module provides the core image conversion logic for converting images
 to WebP and AVIF formats with support for resizing and quality control.
 """
 
+import asyncio
 import logging
+import math
+import os
+import sys
+import threading
+from functools import lru_cache, partial
+from io import BytesIO
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Optional
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import IO, Any, Callable, Iterator, Optional, TypeVar, Union
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from PIL import Image
 import pillow_avif  # noqa: F401
 
+try:
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
 from .validation import (
+    MAX_DIMENSION,
     validate_file_size,
     validate_image_dimensions,
     ImageConversionError,
 )
 
 # Configuration
-SUPPORTED_EXTS = {".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".webp"}
+SUPPORTED_EXTS = frozenset({".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".webp"})
+
+# Output formats (and file extensions) produced for each format argument
+_FORMAT_TARGETS = {"webp": ("webp",), "avif": ("avif",), "both": ("webp", "avif")}
+
+# Environment variable selecting the batch executor: "thread" (default) or
+# "process". Pillow's WebP/AVIF encoders and resampler release the GIL, so
+# threads scale without pickling tasks or duplicating decoded images.
+EXECUTOR_ENV_VAR = "IMAGE_CONVERT_EXECUTOR"
+
+# Environment variable selecting the file conversion backend: "pillow"
+# (default) or "vips". The libvips backend needs the optional pyvips package
+# and falls back to Pillow when it is not installed.
+BACKEND_ENV_VAR = "IMAGE_CONVERT_BACKEND"
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Batch progress is logged every this many images, or every 1% of the batch
+# if that is larger, so huge batches log at most ~100 progress lines
+PROGRESS_LOG_INTERVAL = 50
+
+
+def _default_avif_codec() -> str:
+    """
+    Pick the AV1 encoder used when none is requested.
+    
+    SVT-AV1 is several times faster than libaom at comparable quality, so it
+    is preferred when the installed libavif was built with it.
+    """
+    # Neither Pillow nor pillow_avif has a public query for the encoders
+    # libavif was built with, so ask the plugin's extension module
+    try:
+        plugin = sys.modules[Image.SAVE["AVIF"].__module__]
+        if plugin._avif.encoder_codec_available("svt"):
+            return "svt"
+    except (KeyError, AttributeError) as e:
+        logger.debug("Cannot query AV1 encoders, using libavif's default: %r", e)
+    return "auto"
+
+
+AVIF_CODEC = _default_avif_codec()
+
+# Thread pool used to overlap WebP and AVIF encodes of the same image.
+# Created lazily and dropped in forked children, whose copy has no threads.
+_encode_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_encode_pool() -> ThreadPoolExecutor:
+    """Return the shared encoder thread pool, creating it on first use."""
+    global _encode_pool
+    if _encode_pool is None:
+        _encode_pool = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="encode",
+        )
+    return _encode_pool
+
+
+def _reset_encode_pool() -> None:
+    """Forget the parent's encoder pool after fork."""
+    global _encode_pool
+    _encode_pool = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_encode_pool)
+
+# Persistent batch executor shared by all batch requests
+_batch_pool: Optional[Executor] = None
+_batch_pool_lock = threading.Lock()
+
+# True in process-pool workers, which own their process-wide libvips settings
+_in_worker_process = False
+
+
+def _init_worker() -> None:
+    """Register all format plugins once per worker."""
+    global _in_worker_process
+    _in_worker_process = True
+    # Importing this module already loaded pillow_avif; Image.open() would
+    # otherwise import the remaining plugin modules on the first task
+    Image.init()
+
+
+def _get_batch_pool() -> Executor:
+    """
+    Return the persistent batch executor, creating it on first use.
+    
+    Reusing one pool avoids paying worker start-up and Pillow/pillow_avif
+    imports on every batch request.
+    """
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            max_workers = os.cpu_count() or 1
+            if os.environ.get(EXECUTOR_ENV_VAR, "thread") == "process":
+                _batch_pool = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=_init_worker,
+                )
+            else:
+                _batch_pool = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix="convert",
+                )
+        return _batch_pool
+
+
+def _discard_batch_pool() -> None:
+    """Drop a broken batch executor so the next request starts a new one."""
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is not None:
+            _batch_pool.shutdown(wait=False, cancel_futures=True)
+            _batch_pool = None
+
+
+def shutdown_pools() -> None:
+    """
+    Shut down the shared executors, cancelling conversions not yet started.
+    
+    Call this from the application's shutdown path, not from atexit:
+    concurrent.futures joins its workers, running every queued task, before
+    atexit handlers are called. The pools are recreated if used again.
+    """
+    global _encode_pool
+    _discard_batch_pool()
+    if _encode_pool is not None:
+        _encode_pool.shutdown(wait=False, cancel_futures=True)
+        _encode_pool = None
+
+
+async def run_in_pool(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a conversion function on the shared executor from async code.
+    
+    Uses the same CPU-sized pool as batch conversions (a process pool when
+    IMAGE_CONVERT_EXECUTOR=process), so concurrent requests are spread over
+    the cores instead of queuing on the event loop's default thread pool.
+    
+    Args:
+        func: Picklable callable, e.g. convert_one or convert_bytes
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        The return value of func
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_batch_pool(), partial(func, *args, **kwargs))
+    except BrokenExecutor:
+        _discard_batch_pool()
+        raise
+
 
-def load_image(path: Path) -> Image.Image:
+def load_image(
+    path: Union[Path, IO[bytes]],
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    size_bytes: Optional[int] = None,
+    force_rgba: bool = False,
+) -> Image.Image:
     """
     Load and validate an image file.
     
+    For JPEG sources, passing the target bounds lets libjpeg decode at a
+    reduced scale (1/2, 1/4 or 1/8) so less pixel data is produced before
+    the final resize. The decode stays at least twice the target size to
+    preserve resize quality.
+    
     Args:
-        path: Path to the image file
+        path: Path to the image file, or a binary file object
+        max_width: Target maximum width (None for no limit)
+        max_height: Target maximum height (None for no limit)
+        size_bytes: Already-known file size, avoids another stat call
+        force_rgba: Always return an RGBA image, even for opaque sources
         
     Returns:
-        PIL Image object in RGBA mode
+        PIL Image object in RGB, RGBA or L mode (an opaque alpha channel
+        is dropped when the image is larger than the bounds, unless
+        force_rgba)
         
     Raises:
         ImageConversionError: If image cannot be loaded or is invalid
     """
     try:
-        logger.info(f"Loading image: {path}")
-        validate_file_size(path)
-        img = Image.open(path).convert("RGBA")
+        logger.debug("Loading image: %s", path)
+        validate_file_size(path, size_bytes=size_bytes)
+        # Image.open only parses the header, so oversized images are
+        # rejected before any pixel data is decoded
+        img = Image.open(path)
         validate_image_dimensions(img)
+        if img.format == "JPEG" and (max_width or max_height):
+            # Decode at no less than twice the final size so that Lanczos,
+            # not the cruder DCT scaling, does the last 2x of the reduction
+            width, height = _fit_size(img.width, img.height, max_width, max_height)
+            img.draft(None, (width * 2, height * 2))
+        if force_rgba:
+            return img if img.mode == "RGBA" else img.convert("RGBA")
+        # A transparency key (tRNS) can come with any mode, including RGB and L
+        has_transparency = "transparency" in img.info
+        if has_transparency or img.mode not in ("RGB", "RGBA", "L"):
+            has_alpha = "A" in img.mode or has_transparency
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        shrinks = (max_width and img.width > max_width) or (
+            max_height and img.height > max_height
+        )
+        if shrinks and img.mode == "RGBA" and img.getchannel("A").getextrema() == (255, 255):
+            # The encoders omit an opaque alpha plane anyway, so this only
+            # pays off as a cheaper resize; without one it is pure overhead
+            img = img.convert("RGB")
         return img
     except ImageConversionError:
         raise
@@ -50,10 +263,53 @@ def load_image(path: Path) -> Image.Image:
         raise ImageConversionError(f"Failed to load image {path}: {str(e)}")
 
 
+@lru_cache(maxsize=64)
+def _fit_size(
+    width: int,
+    height: int,
+    max_width: Optional[int],
+    max_height: Optional[int],
+) -> tuple[int, int]:
+    """
+    Compute the aspect-preserving size that fits within the given bounds.
+    
+    Uses the same rounding as Image.thumbnail(). Cached because galleries
+    and batches typically resize many same-sized sources to the same bounds.
+    """
+    x, y = max_width or width, max_height or height
+    if x >= width and y >= height:
+        return width, height
+
+    aspect = width / height
+    if x / y >= aspect:
+        candidates = (math.floor(y * aspect), math.ceil(y * aspect))
+        x = max(min(candidates, key=lambda n: abs(aspect - n / y)), 1)
+    else:
+        candidates = (math.floor(x / aspect), math.ceil(x / aspect))
+        y = max(min(candidates, key=lambda n: 0 if n == 0 else abs(aspect - x / n)), 1)
+    return x, y
+
+
+def _pick_filter(scale: float) -> Image.Resampling:
+    """
+    Choose a resampling filter for a downscale by the given factor.
+    
+    Past 2x the wider Lanczos kernel adds cost without visible benefit, and
+    past 4x a box average has already smoothed away what it would preserve.
+    """
+    if scale > 4:
+        return Image.Resampling.BOX
+    if scale > 2:
+        return Image.Resampling.BILINEAR
+    return Image.Resampling.LANCZOS
+
+
 def resize_if_needed(
     img: Image.Image,
     max_width: Optional[int],
-    max_height: Optional[int]
+    max_height: Optional[int],
+    reducing_gap: Optional[float] = 3.0,
+    resample: Optional[Image.Resampling] = None,
 ) -> Image.Image:
     """
     Resize image if it exceeds maximum dimensions.
@@ -62,22 +318,171 @@ def resize_if_needed(
         img: PIL Image object
         max_width: Maximum width (None for no limit)
         max_height: Maximum height (None for no limit)
+        reducing_gap: For downscales of this factor or more, first shrink
+            by an integer factor with a cheap box reduce, then finish with
+            the resampling filter. 3.0 is visually indistinguishable from a
+            single pass; None disables the pre-reduction.
+        resample: Resampling filter. None picks one by scale: Lanczos up to
+            2x, bilinear up to 4x and box beyond that.
         
     Returns:
         Resized PIL Image object (or original if no resize needed)
     """
-    if max_width or max_height:
-        original_size = img.size
-        img.thumbnail(
-            (max_width or img.width, max_height or img.height),
-            Image.LANCZOS,
-        )
-        new_size = img.size
-        if original_size != new_size:
-            logger.info(f"Resized image from {original_size} to {new_size}")
+    width, height = img.size
+    # Images already within bounds (including no bounds) are the common case
+    if (not max_width or width <= max_width) and (not max_height or height <= max_height):
+        return img
+    new_size = _fit_size(width, height, max_width, max_height)
+    if resample is None:
+        resample = _pick_filter(width / new_size[0])
+    img = img.resize(new_size, resample, reducing_gap=reducing_gap)
+    logger.debug("Resized image from %s to %s", (width, height), new_size)
     return img
 
 
+def _save_webp(
+    img: Image.Image,
+    dest: Union[Path, IO[bytes]],
+    quality: int,
+    lossless: bool,
+    method: int,
+) -> None:
+    """Encode an image as WebP."""
+    img.save(dest, "WEBP", quality=quality, lossless=lossless, method=method)
+
+
+def _save_avif(
+    img: Image.Image,
+    dest: Union[Path, IO[bytes]],
+    quality: int,
+    speed: int,
+    codec: str,
+    threads: Optional[int] = None,
+) -> None:
+    """Encode an image as AVIF, with at most threads encoder threads if given."""
+    if codec == "svt" and min(img.size) < 4:
+        # SVT-AV1 rejects frames smaller than 4x4
+        codec = "auto"
+    options = {} if threads is None else {"max_threads": threads}
+    img.save(dest, "AVIF", quality=quality, speed=speed, codec=codec, **options)
+
+
+def _encode(
+    img: Image.Image,
+    format: str,
+    webp_dest: Optional[Union[Path, IO[bytes]]],
+    avif_dest: Optional[Union[Path, IO[bytes]]],
+    webp_quality: int,
+    avif_quality: int,
+    lossless: bool,
+    webp_method: int,
+    avif_speed: int,
+    avif_codec: str,
+    threads: Optional[int] = None,
+) -> None:
+    """
+    Encode an image to the requested formats.
+    
+    threads caps the CPU threads used (None for all cores). With a single
+    thread, WebP and AVIF are encoded one after the other.
+    """
+    if format == "both" and threads != 1:
+        # Both codecs release the GIL, so encode WebP on the pool while
+        # AVIF runs here. Image.save() keeps per-call encoder state on
+        # the image object, so the WebP branch gets its own copy; the
+        # copy costs far less than either encode.
+        webp_img = img.copy()
+        webp_future = _get_encode_pool().submit(
+            _save_webp, webp_img, webp_dest, webp_quality, lossless, webp_method
+        )
+        try:
+            _save_avif(img, avif_dest, avif_quality, avif_speed, avif_codec, threads)
+        except BaseException:
+            # Do not hand control back (and let the caller delete its temp
+            # files) while the WebP thread may still be writing
+            webp_future.cancel()
+            wait((webp_future,))
+            raise
+        webp_future.result()
+        return
+    if format in ("webp", "both"):
+        _save_webp(img, webp_dest, webp_quality, lossless, webp_method)
+    if format in ("avif", "both"):
+        _save_avif(img, avif_dest, avif_quality, avif_speed, avif_codec, threads)
+
+
+def _vips_enabled() -> bool:
+    """Return True if the libvips backend is requested and available."""
+    return pyvips is not None and os.environ.get(BACKEND_ENV_VAR, "pillow") == "vips"
+
+
+def _convert_one_vips(
+    image_path: Path,
+    webp_path: Optional[Path],
+    avif_path: Optional[Path],
+    format: str,
+    webp_quality: int,
+    avif_quality: int,
+    lossless: bool,
+    max_width: Optional[int],
+    max_height: Optional[int],
+    webp_method: int,
+    avif_speed: int,
+    avif_codec: str,
+    size_bytes: Optional[int],
+    force_rgba: bool,
+    encode_threads: Optional[int] = None,
+) -> None:
+    """
+    Convert a single image with libvips.
+    
+    Image.thumbnail() shrinks on load for JPEG and WebP sources, so decode
+    and resize run as one demand-driven pass instead of materializing the
+    full-size image first.
+    
+    encode_threads caps libvips' worker threads, which also size the AV1
+    encoder's thread pool. The setting is process-wide, so it is only
+    applied here in process-pool workers; iter_convert_batch() sets it once
+    for the whole batch when conversions share the process.
+    """
+    if encode_threads is not None and _in_worker_process:
+        pyvips.concurrency_set(encode_threads)
+    validate_file_size(image_path, size_bytes=size_bytes)
+    # new_from_file only reads the header
+    validate_image_dimensions(pyvips.Image.new_from_file(str(image_path)))
+    img = pyvips.Image.thumbnail(
+        str(image_path),
+        max_width or MAX_DIMENSION,
+        height=max_height or MAX_DIMENSION,
+        size="down",
+        no_rotate=True,
+    )
+    if force_rgba and not img.hasalpha():
+        img = img.colourspace("srgb").bandjoin(255)
+    if format == "both":
+        # Render once so the second save does not rerun decode and resize
+        img = img.copy_memory()
+    if format in ("webp", "both"):
+        img.webpsave(str(webp_path), Q=webp_quality, lossless=lossless, effort=webp_method)
+    if format in ("avif", "both"):
+        # libheif effort runs 0 (fastest) to 9; speed 5 matches its default of 4
+        img.heifsave(
+            str(avif_path),
+            Q=avif_quality,
+            compression="av1",
+            effort=max(0, 9 - avif_speed),
+            encoder=avif_codec,
+        )
+
+
+def _is_up_to_date(output: Path, src_mtime: float) -> bool:
+    """Return True if output exists and is at least as new as the source."""
+    try:
+        return output.stat().st_mtime >= src_mtime
+    except FileNotFoundError:
+        return False
+
+
 def convert_one(
     image_path: Path,
     output_dir: Path,
@@ -87,10 +492,25 @@ def convert_one(
     lossless: bool,
     max_width: Optional[int],
     max_height: Optional[int],
-) -> dict[str, str]:
+    webp_method: int = 4,
+    avif_speed: int = 6,
+    avif_codec: Optional[str] = None,
+    reducing_gap: Optional[float] = 3.0,
+    size_bytes: Optional[int] = None,
+    overwrite: bool = True,
+    force_rgba: bool = False,
+    encode_threads: Optional[int] = None,
+) -> dict[str, Any]:
     """
     Convert a single image to WebP and/or AVIF format.
     
+    Uses Pillow unless IMAGE_CONVERT_BACKEND is set to "vips" and pyvips
+    is installed.
+    
+    With overwrite=False and no resize bounds, outputs that are at least as
+    new as the input are kept as-is, and the input is not decoded at all if
+    every requested output is up to date.
+    
     Args:
         image_path: Path to input image
         output_dir: Directory for output files
@@ -100,80 +520,292 @@ def convert_one(
         lossless: Enable lossless compression for WebP
         max_width: Maximum output width
         max_height: Maximum output height
+        webp_method: WebP encoder effort (0-6, 6 is slowest/smallest)
+        avif_speed: AVIF encoder speed (0-10, 0 is slowest/smallest)
+        avif_codec: AV1 encoder ('auto', 'aom', 'svt', 'rav1e'); defaults to
+            AVIF_CODEC, which prefers SVT-AV1 when available
+        reducing_gap: Two-step resize threshold (None for a single pass)
+        size_bytes: Input file size if already known (skips a stat call)
+        overwrite: Re-encode outputs even if they are up to date
+        force_rgba: Load and resize as RGBA even for opaque sources
+        encode_threads: CPU threads the encoders may use (None for all
+            cores); batch conversions split the cores between workers
         
     Returns:
-        Dictionary with conversion results
+        Dictionary with the input path and each output path, plus a
+        "skipped" list of the formats left as-is because they were up to date
         
     Raises:
         ImageConversionError: If conversion fails
     """
+    avif_codec = avif_codec or AVIF_CODEC
     try:
-        img = load_image(image_path)
-        img = resize_if_needed(img, max_width, max_height)
-        results: dict[str, str] = {"input": str(image_path)}
+        results: dict[str, Any] = {"input": str(image_path)}
         name = image_path.stem
+        targets = _FORMAT_TARGETS[format]
+        outputs = {fmt: output_dir / f"{name}.{fmt}" for fmt in targets}
 
-        if format in ("webp", "both"):
-            webp_path = output_dir / f"{name}.webp"
-            img.save(webp_path, "WEBP", quality=webp_quality, lossless=lossless, method=6)
-            results["webp"] = str(webp_path)
-            logger.info(f"Created WebP: {webp_path}")
+        if not overwrite and max_width is None and max_height is None:
+            src_mtime = image_path.stat().st_mtime
+            for fmt in targets:
+                if _is_up_to_date(outputs[fmt], src_mtime):
+                    results[fmt] = str(outputs[fmt])
+                    logger.debug("Up to date, skipping: %s", outputs[fmt])
+            targets = tuple(fmt for fmt in targets if fmt not in results)
+            if len(targets) < len(outputs):
+                # Callers must be able to tell that new settings were not applied
+                results["skipped"] = [fmt for fmt in outputs if fmt not in targets]
+            if not targets:
+                return results
+            format = "both" if len(targets) == 2 else targets[0]
 
-        if format in ("avif", "both"):
-            avif_path = output_dir / f"{name}.avif"
-            img.save(avif_path, "AVIF", quality=avif_quality, speed=4)
-            results["avif"] = str(avif_path)
-            logger.info(f"Created AVIF: {avif_path}")
+        # Encode to temporary names and rename into place, so an interrupted
+        # encode never leaves a partial file that looks up to date
+        tmp_outputs = {fmt: outputs[fmt].with_name(outputs[fmt].name + ".tmp") for fmt in targets}
+        try:
+            if _vips_enabled():
+                _convert_one_vips(
+                    image_path, tmp_outputs.get("webp"), tmp_outputs.get("avif"), format,
+                    webp_quality, avif_quality, lossless, max_width, max_height,
+                    webp_method, avif_speed, avif_codec, size_bytes, force_rgba,
+                    encode_threads,
+                )
+            else:
+                img = load_image(image_path, max_width, max_height, size_bytes, force_rgba)
+                img = resize_if_needed(img, max_width, max_height, reducing_gap)
+                _encode(
+                    img, format, tmp_outputs.get("webp"), tmp_outputs.get("avif"),
+                    webp_quality, avif_quality, lossless,
+                    webp_method, avif_speed, avif_codec, encode_threads,
+                )
+            for fmt in targets:
+                os.replace(tmp_outputs[fmt], outputs[fmt])
+        except BaseException:
+            for fmt in targets:
+                tmp_outputs[fmt].unlink(missing_ok=True)
+            raise
+
+        for fmt in targets:
+            results[fmt] = str(outputs[fmt])
+            logger.debug("Created %s: %s", fmt, outputs[fmt])
 
         return results
     except Exception as e:
         raise ImageConversionError(f"Conversion failed for {image_path}: {str(e)}")
 
 
-def convert_batch_parallel(
+def convert_bytes(
+    data: bytes,
+    format: str,
+    webp_quality: int,
+    avif_quality: int,
+    lossless: bool,
+    max_width: Optional[int],
+    max_height: Optional[int],
+    webp_method: int = 4,
+    avif_speed: int = 6,
+    avif_codec: Optional[str] = None,
+    reducing_gap: Optional[float] = 3.0,
+    force_rgba: bool = False,
+) -> dict[str, bytes]:
+    """
+    Convert an in-memory image to WebP and/or AVIF bytes.
+    
+    Decodes from and encodes to memory without touching the filesystem,
+    for callers that already hold the upload in memory (e.g. serverless
+    request bodies).
+    
+    Args:
+        data: Encoded input image
+        format: Output format ('webp', 'avif', or 'both')
+        webp_quality: WebP quality (1-100)
+        avif_quality: AVIF quality (1-100)
+        lossless: Enable lossless compression for WebP
+        max_width: Maximum output width
+        max_height: Maximum output height
+        webp_method: WebP encoder effort (0-6, 6 is slowest/smallest)
+        avif_speed: AVIF encoder speed (0-10, 0 is slowest/smallest)
+        avif_codec: AV1 encoder; defaults to AVIF_CODEC
+        reducing_gap: Two-step resize threshold (None for a single pass)
+        force_rgba: Load and resize as RGBA even for opaque sources
+        
+    Returns:
+        Dictionary mapping 'webp' and/or 'avif' to the encoded bytes
+        
+    Raises:
+        ImageConversionError: If conversion fails
+    """
+    avif_codec = avif_codec or AVIF_CODEC
+    try:
+        img = load_image(
+            BytesIO(data), max_width, max_height, size_bytes=len(data), force_rgba=force_rgba
+        )
+        img = resize_if_needed(img, max_width, max_height, reducing_gap)
+        buffers = {fmt: BytesIO() for fmt in _FORMAT_TARGETS[format]}
+
+        _encode(
+            img, format, buffers.get("webp"), buffers.get("avif"),
+            webp_quality, avif_quality, lossless,
+            webp_method, avif_speed, avif_codec,
+        )
+
+        return {fmt: buf.getvalue() for fmt, buf in buffers.items()}
+    except Exception as e:
+        raise ImageConversionError(f"Conversion failed for in-memory image: {str(e)}")
+
+
+def _iter_images(input_dir: Path) -> Iterator[tuple[Path, int]]:
+    """
+    Yield supported image files in a directory with their sizes.
+    
+    DirEntry caches the file type from the directory listing, so filtering
+    needs no extra syscall, and the one stat per match provides the size
+    that convert_one would otherwise look up again.
+    """
+    with os.scandir(input_dir) as it:
+        for entry in it:
+            if (
+                os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTS
+                and entry.is_file()
+            ):
+                yield Path(entry.path), entry.stat().st_size
+
+
+def _safe_convert(image_path: Path, size_bytes: int, **kwargs: Any) -> dict[str, Any]:
+    """Run convert_one(), returning failures as an error result."""
+    try:
+        return convert_one(image_path, size_bytes=size_bytes, **kwargs)
+    except Exception as e:
+        return {"input": str(image_path), "error": str(e)}
+
+
+def _convert_chunk(
+    items: list[tuple[Path, int]],
+    **kwargs: Any
+) -> list[dict[str, Any]]:
+    """Convert a chunk of images in one executor task."""
+    return [_safe_convert(path, size_bytes, **kwargs) for path, size_bytes in items]
+
+
+def iter_convert_batch(
     input_dir: Path,
     workers: Optional[int],
     **kwargs: Any
-) -> list[dict[str, str]]:
+) -> Iterator[dict[str, Any]]:
     """
-    Convert multiple images in parallel.
+    Convert multiple images in parallel, yielding results as they complete.
+    
+    Results are not buffered, so callers can report progress as soon as the
+    fastest image finishes. Closing the generator early cancels conversions
+    that have not been submitted yet.
+    
+    With the process executor, images are dispatched in chunks so that
+    large batches of small images are not dominated by per-task pickling
+    and pipe round-trips.
     
     Args:
         input_dir: Directory containing input images
         workers: Number of parallel workers (None for CPU count)
         **kwargs: Additional arguments passed to convert_one()
         
-    Returns:
-        List of conversion results for each image
+    Yields:
+        Conversion result for each image, in completion order
     """
-    import os
-    
-    images = [
-        p for p in input_dir.iterdir()
-        if p.is_file() and p.suffix.lower() in SUPPORTED_EXTS
-    ]
+    images = list(_iter_images(input_dir))
     
     if not images:
-        logger.warning(f"No supported images found in {input_dir}")
-        return []
+        logger.warning("No supported images found in %s", input_dir)
+        return
+    
+    # Largest files first (LPT scheduling): encode time grows with image
+    # size, so a big image left for the last wave would stall the batch
+    images.sort(key=itemgetter(1), reverse=True)
     
-    results: list[dict[str, str]] = []
     max_workers = workers or os.cpu_count() or 1
     
-    logger.info(f"Processing {len(images)} images with {max_workers} workers")
+    logger.info("Processing %d images with %d workers", len(images), max_workers)
+    
+    # The pool is shared, so keep at most max_workers of this request's
+    # tasks in flight and submit the next chunk as each one finishes
+    executor = _get_batch_pool()
+    total = len(images)
+    chunksize = 1
+    if isinstance(executor, ProcessPoolExecutor):
+        chunksize = max(1, total // (max_workers * 4))
+    chunks = (images[i:i + chunksize] for i in range(0, total, chunksize))
+    # Split the cores between concurrent conversions so that each AVIF
+    # encoder's own threads do not oversubscribe the CPU
+    kwargs.setdefault("encode_threads", max(1, (os.cpu_count() or 1) // max_workers))
+    # Bind the shared arguments once rather than rebuilding them per task
+    worker = partial(_convert_chunk, **kwargs)
+    futures: dict[Future, list[tuple[Path, int]]] = {}
+    # libvips' thread count is process-wide: with the thread executor, cap it
+    # for the duration of the batch rather than per conversion
+    restore_vips_threads = None
+
+    def submit_next() -> None:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        try:
+            future = executor.submit(worker, chunk)
+        except BrokenExecutor:
+            _discard_batch_pool()
+            raise
+        futures[future] = chunk
+
+    progress_interval = max(PROGRESS_LOG_INTERVAL, total // 100)
+    completed = 0
+    failed = 0
+    try:
+        if _vips_enabled() and not isinstance(executor, ProcessPoolExecutor):
+            restore_vips_threads = pyvips.concurrency_get()
+            pyvips.concurrency_set(kwargs["encode_threads"])
+        for _ in range(max_workers):
+            submit_next()
+        
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = futures.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    if isinstance(e, BrokenExecutor):
+                        _discard_batch_pool()
+                    results = [{"input": str(path), "error": str(e)} for path, _ in chunk]
+                submit_next()
+                for result in results:
+                    if "error" in result:
+                        logger.error("Failed to convert %s: %s", result["input"], result["error"])
+                        failed += 1
+                    completed += 1
+                    if completed % progress_interval == 0 and completed < total:
+                        logger.info("Progress: %d/%d", completed, total)
+                    yield result
+        
+        logger.info("Finished %d images (%d failed)", total, failed)
+    finally:
+        for future in futures:
+            future.cancel()
+        if restore_vips_threads is not None:
+            pyvips.concurrency_set(restore_vips_threads)
+
+
+def convert_batch_parallel(
+    input_dir: Path,
+    workers: Optional[int],
+    **kwargs: Any
+) -> list[dict[str, Any]]:
+    """
+    Convert multiple images in parallel.
     
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(convert_one, img, **kwargs): img
-            for img in images
-        }
+    Args:
+        input_dir: Directory containing input images
+        workers: Number of parallel workers (None for CPU count)
+        **kwargs: Additional arguments passed to convert_one()
         
-        for future in as_completed(futures):
-            try:
-                results.append(future.result())
-            except Exception as e:
-                img_path = futures[future]
-                logger.error(f"Failed to convert {img_path}: {e}")
-                results.append({"input": str(img_path), "error": str(e)})
-    
-    return results
+    Returns:
+        List of conversion results for each image
+    """
+    return list(iter_convert_batch(input_dir, workers, **kwargs))
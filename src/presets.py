@@ -5,7 +5,8 @@ This module provides predefined conversion settings for common use cases,
 making it easy to apply optimal settings without manual configuration.
 """
 
-from typing import TypedDict, Optional
+from types import MappingProxyType
+from typing import Any, Mapping, TypedDict, Optional
 
 
 class PresetConfig(TypedDict, total=False):
@@ -16,6 +17,7 @@ class PresetConfig(TypedDict, total=False):
     lossless: bool
     max_width: Optional[int]
     max_height: Optional[int]
+    avif_speed: int
 
 
 # Predefined conversion presets
@@ -27,6 +29,7 @@ PRESETS: dict[str, PresetConfig] = {
         "lossless": False,
         "max_width": 1920,
         "max_height": None,
+        "avif_speed": 6,
     },
     "thumbnail": {
         "format": "webp",
@@ -67,6 +70,7 @@ PRESETS: dict[str, PresetConfig] = {
         "lossless": False,
         "max_width": None,
         "max_height": None,
+        "avif_speed": 2,
     },
     "lossless": {
         "format": "webp",
@@ -87,7 +91,13 @@ PRESETS: dict[str, PresetConfig] = {
 }
 
 
-def get_preset(name: str) -> PresetConfig:
+# Read-only views of the presets, built once so lookups need no copy
+_PRESETS_FROZEN: dict[str, Mapping[str, Any]] = {
+    name: MappingProxyType(config) for name, config in PRESETS.items()
+}
+
+
+def get_preset(name: str) -> Mapping[str, Any]:
     """
     Get a preset configuration by name.
     
@@ -95,32 +105,37 @@ def get_preset(name: str) -> PresetConfig:
         name: Preset name (web, thumbnail, social, hd, 4k, archive, lossless, max-compression)
         
     Returns:
-        PresetConfig dictionary with conversion settings
+        Read-only mapping with the preset's conversion settings (use
+        dict(preset) for a modifiable copy)
         
     Raises:
         ValueError: If preset name is not found
     """
-    if name not in PRESETS:
+    try:
+        return _PRESETS_FROZEN[name]
+    except KeyError:
         available = ", ".join(PRESETS.keys())
-        raise ValueError(f"Unknown preset '{name}'. Available presets: {available}")
-    return PRESETS[name].copy()
+        raise ValueError(f"Unknown preset '{name}'. Available presets: {available}") from None
+
+
+# Preset descriptions, built once and shared read-only
+_PRESET_DESCRIPTIONS: Mapping[str, str] = MappingProxyType({
+    "web": "Optimized for web pages (WebP, quality 80, max 1920px wide)",
+    "thumbnail": "Small thumbnails (WebP, quality 70, max 300x300)",
+    "social": "Social media images (WebP, quality 85, 1200x630)",
+    "hd": "HD resolution (WebP, quality 90, 1920x1080)",
+    "4k": "4K resolution (WebP, quality 90, 3840x2160)",
+    "archive": "High quality archival (Both formats, quality 95/90)",
+    "lossless": "Lossless WebP compression (no quality loss)",
+    "max-compression": "Maximum file size reduction (AVIF, quality 40)",
+})
 
 
-def list_presets() -> dict[str, str]:
+def list_presets() -> Mapping[str, str]:
     """
     List all available presets with descriptions.
     
     Returns:
-        Dictionary mapping preset names to descriptions
+        Read-only mapping of preset names to descriptions
     """
-    descriptions = {
-        "web": "Optimized for web pages (WebP, quality 80, max 1920px wide)",
-        "thumbnail": "Small thumbnails (WebP, quality 70, max 300x300)",
-        "social": "Social media images (WebP, quality 85, 1200x630)",
-        "hd": "HD resolution (WebP, quality 90, 1920x1080)",
-        "4k": "4K resolution (WebP, quality 90, 3840x2160)",
-        "archive": "High quality archival (Both formats, quality 95/90)",
-        "lossless": "Lossless WebP compression (no quality loss)",
-        "max-compression": "Maximum file size reduction (AVIF, quality 40)",
-    }
-    return descriptions
+    return _PRESET_DESCRIPTIONS
@@ -15,6 +15,16 @@ def get_file_size(path: Path) -> int:
     return os.path.getsize(path)
 
 
+def _size_if_exists(path: Optional[Path]) -> Optional[int]:
+    """Get file size in bytes, or None if there is no such file."""
+    if path is None:
+        return None
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return None
+
+
 def format_size(size_bytes: int) -> str:
     """
     Format byte size to human readable string.
@@ -29,8 +39,35 @@ def format_size(size_bytes: int) -> str:
         return f"{size_bytes} B"
     elif size_bytes < 1024 * 1024:
         return f"{size_bytes / 1024:.1f} KB"
-    else:
+    elif size_bytes < 1024 * 1024 * 1024:
         return f"{size_bytes / (1024 * 1024):.2f} MB"
+    else:
+        return f"{size_bytes / (1024 * 1024 * 1024):.2f} GB"
+
+
+def calculate_savings_raw(original_size: int, new_size: int) -> tuple[int, int, bool]:
+    """
+    Calculate compression savings without any string formatting.
+    
+    For bulk reports that serialize numbers rather than display strings.
+    
+    Args:
+        original_size: Original file size in bytes
+        new_size: New file size in bytes
+        
+    Returns:
+        Tuple of (bytes saved, percent saved x10 rounded half up to an
+        integer, whether the file got larger). The rounding can differ from
+        calculate_savings() in the last digit, e.g. 16 -> 3 bytes gives 813
+        here but "81.2%" there.
+    """
+    saved = original_size - new_size
+    if original_size > 0:
+        # Integer round-half-up of saved / original * 1000
+        percent_x10 = (saved * 2000 + original_size) // (2 * original_size)
+    else:
+        percent_x10 = 0
+    return saved, percent_x10, saved < 0
 
 
 def calculate_savings(original_size: int, new_size: int) -> dict[str, str]:
@@ -51,19 +88,20 @@ def calculate_savings(original_size: int, new_size: int) -> dict[str, str]:
     """
     saved = original_size - new_size
     
+    # Format the ratio in its own branch rather than via an inf sentinel
     if original_size > 0:
         percent = (saved / original_size) * 100
-        ratio = original_size / new_size if new_size > 0 else float('inf')
+        ratio = f"{original_size / new_size:.1f}:1" if new_size > 0 else "∞:1"
     else:
         percent = 0
-        ratio = 1
+        ratio = "1.0:1"
     
     return {
         "original_size": format_size(original_size),
         "new_size": format_size(new_size),
         "saved_bytes": format_size(abs(saved)),
         "savings_percent": f"{percent:.1f}%",
-        "compression_ratio": f"{ratio:.1f}:1" if ratio != float('inf') else "∞:1",
+        "compression_ratio": ratio,
         "increased": saved < 0,  # True if file got larger
     }
 
@@ -95,33 +133,36 @@ def get_conversion_stats(
         "input_size_bytes": original_size,
     }
     
-    if webp_path and webp_path.exists():
-        webp_size = get_file_size(webp_path)
+    # One stat per output; a missing file simply has no stats
+    webp_size = _size_if_exists(webp_path)
+    avif_size = _size_if_exists(avif_path)
+    
+    if webp_size is not None:
         stats["webp"] = {
             "path": str(webp_path),
             **calculate_savings(original_size, webp_size),
         }
     
-    if avif_path and avif_path.exists():
-        avif_size = get_file_size(avif_path)
+    if avif_size is not None:
         stats["avif"] = {
             "path": str(avif_path),
             **calculate_savings(original_size, avif_size),
         }
     
     # Determine best format
-    if "webp" in stats and "avif" in stats:
-        webp_size = get_file_size(webp_path)
-        avif_size = get_file_size(avif_path)
+    if webp_size is not None and avif_size is not None:
         stats["best_format"] = "avif" if avif_size < webp_size else "webp"
-    elif "webp" in stats:
+    elif webp_size is not None:
         stats["best_format"] = "webp"
-    elif "avif" in stats:
+    elif avif_size is not None:
         stats["best_format"] = "avif"
     
     return stats
 
 
+_STATS_HEADER = "📊 Compression Statistics"
+
+
 def format_stats_summary(stats: dict) -> str:
     """
     Format conversion stats as a human-readable summary.
@@ -135,10 +176,7 @@ def format_stats_summary(stats: dict) -> str:
     if "error" in stats:
         return f"❌ {stats['error']}"
     
-    lines = [
-        "📊 Compression Statistics",
-        f"   Input: {stats['input_size']}",
-    ]
+    lines = [_STATS_HEADER, f"   Input: {stats['input_size']}"]
     
     if "webp" in stats:
         webp = stats["webp"]
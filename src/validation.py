@@ -5,15 +5,32 @@ This module provides validation functions for file paths, sizes, dimensions,
 and parameters to ensure safe and correct operation.
 """
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
-from PIL import Image
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 # Security limits
 MAX_FILE_SIZE_MB = 100
 MAX_DIMENSION = 10000
 
 
+# Allowed values for the string tool parameters
+_VALID_FORMATS = frozenset({"webp", "avif", "both"})
+_VALID_CODECS = frozenset({"auto", "aom", "svt", "rav1e"})
+_VALID_MODES = frozenset({"single", "batch"})
+
+# Inclusive ranges for the integer tool parameters
+_INT_RANGES = (
+    ("webp_quality", 1, 100),
+    ("avif_quality", 1, 100),
+    ("webp_method", 0, 6),
+    ("avif_speed", 0, 10),
+)
+
+
 class ImageConversionError(Exception):
     """Custom exception for image conversion errors."""
     pass
@@ -24,6 +41,17 @@ class ValidationError(Exception):
     pass
 
 
+@lru_cache(maxsize=256)
+def _resolve(path_str: str) -> str:
+    """
+    Resolve symlinks in an absolute path string.
+    
+    Cached because warm servers see the same input and output directories
+    on every request, and each resolve() costs a readlink per component.
+    """
+    return str(Path(path_str).resolve())
+
+
 def validate_path(path: Path, must_exist: bool = True) -> Path:
     """
     Validate and sanitize file paths.
@@ -33,13 +61,18 @@ def validate_path(path: Path, must_exist: bool = True) -> Path:
         must_exist: Whether the path must exist
         
     Returns:
-        Resolved absolute path
+        Absolute path. Relative paths and paths containing '..' are
+        resolved; other absolute paths are returned as given, skipping
+        a readlink per component.
         
     Raises:
         ValidationError: If path is invalid or doesn't exist when required
     """
     try:
-        abs_path = path.resolve()
+        if path.is_absolute() and ".." not in path.parts:
+            abs_path = path
+        else:
+            abs_path = Path(_resolve(str(path.absolute())))
         if must_exist and not abs_path.exists():
             raise ValidationError(f"Path does not exist: {path}")
         return abs_path
@@ -49,38 +82,48 @@ def validate_path(path: Path, must_exist: bool = True) -> Path:
         raise ValidationError(f"Invalid path: {path} - {str(e)}")
 
 
-def validate_file_size(path: Path, max_size_mb: int = MAX_FILE_SIZE_MB) -> None:
+def validate_file_size(
+    path: Path,
+    max_size_mb: int = MAX_FILE_SIZE_MB,
+    size_bytes: Optional[int] = None,
+) -> None:
     """
     Validate file size against maximum limit.
     
     Args:
         path: Path to file
         max_size_mb: Maximum allowed size in MB
+        size_bytes: Already-known file size in bytes (e.g. from a directory
+            scan); skips the stat call when given
         
     Raises:
         ValidationError: If file exceeds size limit
     """
-    if not path.exists():
-        return
+    if size_bytes is None:
+        try:
+            size_bytes = path.stat().st_size
+        except FileNotFoundError:
+            return
         
-    file_size_mb = path.stat().st_size / (1024 * 1024)
-    if file_size_mb > max_size_mb:
+    # Integer compare; the MB figure is only needed for the error message
+    if size_bytes > max_size_mb * 1024 * 1024:
         raise ValidationError(
-            f"File too large: {file_size_mb:.2f}MB (max: {max_size_mb}MB)"
+            f"File too large: {size_bytes / (1024 * 1024):.2f}MB (max: {max_size_mb}MB)"
         )
 
 
-def validate_image_dimensions(img: Image.Image) -> None:
+def validate_image_dimensions(img: "Image.Image") -> None:
     """
     Validate image dimensions against maximum limits.
     
     Args:
-        img: PIL Image object
+        img: PIL Image object (or any image with width and height, such as
+            a pyvips Image)
         
     Raises:
         ValidationError: If image dimensions exceed limits
     """
-    width, height = img.size
+    width, height = img.width, img.height
     if width > MAX_DIMENSION or height > MAX_DIMENSION:
         raise ValidationError(
             f"Image dimensions too large: {width}x{height} (max: {MAX_DIMENSION})"
@@ -97,21 +140,23 @@ def validate_params(arguments: dict[str, Any]) -> None:
     Raises:
         ValidationError: If parameters are invalid
     """
-    if "input_path" not in arguments:
-        raise ValidationError("Missing required parameter: input_path")
+    if "input_path" not in arguments and "input_bytes" not in arguments:
+        raise ValidationError("Missing required parameter: input_path or input_bytes")
         
     format_type = arguments.get("format", "both")
-    if format_type not in ("webp", "avif", "both"):
+    if format_type not in _VALID_FORMATS:
         raise ValidationError(f"Invalid format: {format_type}")
         
-    webp_quality = arguments.get("webp_quality", 80)
-    avif_quality = arguments.get("avif_quality", 50)
+    # Only parameters actually passed need checking; defaults are in range
+    for name, low, high in _INT_RANGES:
+        value = arguments.get(name)
+        if value is not None and not low <= value <= high:
+            raise ValidationError(f"{name} must be {low}-{high}, got {value}")
     
-    if not 1 <= webp_quality <= 100:
-        raise ValidationError(f"webp_quality must be 1-100, got {webp_quality}")
-    if not 1 <= avif_quality <= 100:
-        raise ValidationError(f"avif_quality must be 1-100, got {avif_quality}")
+    avif_codec = arguments.get("avif_codec", "auto")
+    if avif_codec not in _VALID_CODECS:
+        raise ValidationError(f"Invalid avif_codec: {avif_codec}")
     
     mode = arguments.get("mode")
-    if mode and mode not in ("single", "batch"):
+    if mode and mode not in _VALID_MODES:
         raise ValidationError(f"Invalid mode: {mode}")
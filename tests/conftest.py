@@ -0,0 +1,45 @@
+"""
+Shared pytest fixtures.
+
+Source images are encoded once per session, uncompressed since only their
+pixels matter; tests that write next to their input get a function-scoped
+copy.
+"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+
+@pytest.fixture(scope="session")
+def temp_image(tmp_path_factory) -> Path:
+    """Create a test image shared by all tests. Treat it as read-only."""
+    img_path = tmp_path_factory.mktemp("images") / "test.png"
+    Image.new("RGB", (100, 100), color="red").save(img_path, "PNG", compress_level=0)
+    return img_path
+
+
+@pytest.fixture(scope="session")
+def _workspace_source(tmp_path_factory) -> Path:
+    """Create the source image copied into each workspace."""
+    img_path = tmp_path_factory.mktemp("workspace_source") / "input.png"
+    Image.new("RGB", (50, 50), color="blue").save(img_path, "PNG", compress_level=0)
+    return img_path
+
+
+@pytest.fixture
+def temp_workspace(tmp_path, _workspace_source) -> tuple[Path, Path]:
+    """Create temporary workspace for conversions."""
+    input_path = tmp_path / "input.png"
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    shutil.copyfile(_workspace_source, input_path)
+    return input_path, output_dir
+
+
+@pytest.fixture(scope="session")
+def small_image() -> Image.Image:
+    """Create an in-bounds image shared by all tests. Treat it as read-only."""
+    return Image.new("RGB", (1000, 1000))
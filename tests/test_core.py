@@ -7,41 +7,97 @@ Run with: python -m pytest tests/test_core.py -v
 import pytest
 from pathlib import Path
 from PIL import Image
-import tempfile
-import shutil
+import asyncio
+import os
+import struct
+import threading
+import time
+from io import BytesIO
 
 from src import (
     load_image,
     resize_if_needed,
     convert_one,
+    convert_bytes,
+    iter_convert_batch,
+    run_in_pool,
+    shutdown_pools,
     ImageConversionError,
+    MAX_DIMENSION,
 )
+import src.core as src_core
+
+
+def _webp_size(path: Path) -> tuple[int, int]:
+    """Read WebP dimensions from the first chunk header without decoding."""
+    with open(path, "rb") as f:
+        data = f.read(30)
+    assert data[:4] == b"RIFF" and data[8:12] == b"WEBP"
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        bits = struct.unpack("<I", data[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return (
+            int.from_bytes(data[24:27], "little") + 1,
+            int.from_bytes(data[27:30], "little") + 1,
+        )
+    raise ValueError(f"Unknown WebP chunk: {chunk!r}")
 
 
 class TestImageOperations:
     """Test image loading and manipulation."""
     
-    @pytest.fixture
-    def temp_image(self):
-        """Create a temporary test image."""
-        temp_dir = tempfile.mkdtemp()
-        img_path = Path(temp_dir) / "test.png"
-        
-        # Create a small test image
-        img = Image.new("RGB", (100, 100), color="red")
-        img.save(img_path, "PNG")
-        
-        yield img_path
-        
-        # Cleanup
-        shutil.rmtree(temp_dir)
-    
     def test_load_image_success(self, temp_image):
         """Test successful image loading."""
         img = load_image(temp_image)
-        assert img.mode == "RGBA"
+        assert img.mode == "RGB"
         assert img.size == (100, 100)
     
+    def test_load_image_keeps_alpha(self, tmp_path):
+        """Test that palette transparency is preserved as RGBA."""
+        img_path = tmp_path / "palette.png"
+        img = Image.new("P", (10, 10))
+        img.save(img_path, "PNG", transparency=0)
+        
+        assert load_image(img_path).mode == "RGBA"
+    
+    def test_load_image_drops_opaque_alpha(self, tmp_path):
+        """Test that a fully opaque alpha channel is dropped."""
+        img_path = tmp_path / "opaque.png"
+        Image.new("RGBA", (10, 10), color=(255, 0, 0, 255)).save(img_path, "PNG")
+        
+        assert load_image(img_path, max_width=5).mode == "RGB"
+        # Without a downscale the check is skipped; the encoders drop it anyway
+        assert load_image(img_path).mode == "RGBA"
+    
+    def test_load_image_force_rgba(self, temp_image):
+        """Test force_rgba adds an alpha channel to opaque sources."""
+        assert load_image(temp_image, force_rgba=True).mode == "RGBA"
+    
+    def test_load_image_jpeg_draft(self, tmp_path):
+        """Test JPEG sources are decoded at reduced scale when bounds are given."""
+        img_path = tmp_path / "large.jpg"
+        Image.new("RGB", (800, 800), color="green").save(img_path, "JPEG")
+        
+        img = load_image(img_path, max_width=100, max_height=100)
+        assert img.size == (200, 200)
+        
+        # A single bound still allows a reduced decode
+        img = load_image(img_path, max_width=100)
+        assert img.size == (200, 200)
+    
+    def test_load_image_rejects_oversized_header(self, tmp_path):
+        """Test oversized images are rejected from the header alone."""
+        img_path = tmp_path / "wide.png"
+        Image.new("1", (MAX_DIMENSION + 1, 1)).save(img_path, "PNG")
+        
+        with pytest.raises(ImageConversionError, match="dimensions too large"):
+            load_image(img_path)
+    
     def test_load_image_nonexistent(self):
         """Test loading nonexistent image raises error."""
         with pytest.raises(ImageConversionError):
@@ -53,6 +109,11 @@ class TestImageOperations:
         resized = resize_if_needed(img, None, None)
         assert resized.size == (100, 100)
     
+    def test_resize_if_needed_within_bounds(self):
+        """Test that an image within the bounds is returned unchanged."""
+        img = Image.new("RGB", (100, 50))
+        assert resize_if_needed(img, 200, 100) is img
+    
     def test_resize_if_needed_width_limit(self):
         """Test resizing with width limit."""
         img = Image.new("RGB", (200, 100))
@@ -64,28 +125,17 @@ class TestImageOperations:
         img = Image.new("RGB", (100, 200))
         resized = resize_if_needed(img, None, 100)
         assert resized.size == (50, 100)  # Aspect ratio preserved
+    
+    def test_resize_if_needed_large_downscale(self):
+        """Test large downscales (box filter) keep the fitted size."""
+        img = Image.new("RGB", (1000, 500))
+        resized = resize_if_needed(img, 90, None)
+        assert resized.size == (90, 45)
 
 
 class TestConversion:
     """Test image conversion functions."""
     
-    @pytest.fixture
-    def temp_workspace(self):
-        """Create temporary workspace for conversions."""
-        temp_dir = tempfile.mkdtemp()
-        input_path = Path(temp_dir) / "input.png"
-        output_dir = Path(temp_dir) / "output"
-        output_dir.mkdir()
-        
-        # Create test image
-        img = Image.new("RGB", (50, 50), color="blue")
-        img.save(input_path, "PNG")
-        
-        yield input_path, output_dir
-        
-        # Cleanup
-        shutil.rmtree(temp_dir)
-    
     def test_convert_one_webp(self, temp_workspace):
         """Test converting to WebP."""
         input_path, output_dir = temp_workspace
@@ -146,6 +196,36 @@ class TestConversion:
         assert "avif" in result
         assert Path(result["webp"]).exists()
         assert Path(result["avif"]).exists()
+        assert not list(output_dir.glob("*.tmp"))
+    
+    @pytest.mark.parametrize(
+        "mode, key, fill",
+        [("RGB", (0, 0, 0), (255, 0, 0)), ("L", 0, 200)],
+        ids=["rgb", "l"],
+    )
+    def test_convert_one_keeps_transparency_key(self, tmp_path, mode, key, fill):
+        """Test that a tRNS colour key on RGB and L sources becomes alpha."""
+        input_path = tmp_path / "keyed.png"
+        img = Image.new(mode, (8, 8), fill)
+        img.putpixel((0, 0), key)
+        img.save(input_path, "PNG", transparency=key)
+        
+        result = convert_one(
+            image_path=input_path,
+            output_dir=tmp_path,
+            format="both",
+            webp_quality=80,
+            avif_quality=50,
+            lossless=True,
+            max_width=None,
+            max_height=None,
+        )
+        
+        for fmt in ("webp", "avif"):
+            with Image.open(result[fmt]) as out:
+                assert out.mode == "RGBA"
+                assert out.getpixel((0, 0))[3] == 0
+                assert out.getpixel((7, 7))[3] == 255
     
     def test_convert_one_with_resize(self, temp_workspace):
         """Test conversion with resizing."""
@@ -166,9 +246,211 @@ class TestConversion:
         webp_path = Path(result["webp"])
         assert webp_path.exists()
         
-        # Load and check dimensions
-        img = Image.open(webp_path)
-        assert img.size == (25, 25)
+        # Check dimensions from the header
+        assert _webp_size(webp_path) == (25, 25)
+    
+    def test_convert_one_failure_leaves_no_tmp(self, temp_workspace, monkeypatch):
+        """Test a failed AVIF encode does not leave the WebP temp file behind."""
+        input_path, output_dir = temp_workspace
+        webp_started = threading.Event()
+        webp_done = threading.Event()
+        save_webp = src_core._save_webp
+        
+        def slow_webp(*args, **kwargs):
+            webp_started.set()
+            time.sleep(0.3)
+            save_webp(*args, **kwargs)
+            webp_done.set()
+        
+        def failing_avif(*args, **kwargs):
+            # Fail while the WebP encode is in flight
+            webp_started.wait(5)
+            raise RuntimeError("AVIF encode failed")
+        
+        monkeypatch.setattr(src_core, "_save_webp", slow_webp)
+        monkeypatch.setattr(src_core, "_save_avif", failing_avif)
+        
+        with pytest.raises(ImageConversionError, match="AVIF encode failed"):
+            convert_one(
+                image_path=input_path,
+                output_dir=output_dir,
+                format="both",
+                webp_quality=80,
+                avif_quality=50,
+                lossless=False,
+                max_width=None,
+                max_height=None,
+            )
+        
+        # convert_one must not return before the WebP thread has finished
+        assert webp_done.is_set()
+        assert not list(output_dir.iterdir())
+    
+    def test_convert_one_skips_up_to_date(self, temp_workspace):
+        """Test outputs newer than the input are not re-encoded."""
+        input_path, output_dir = temp_workspace
+        args = dict(
+            image_path=input_path,
+            output_dir=output_dir,
+            format="both",
+            webp_quality=80,
+            avif_quality=50,
+            lossless=False,
+            max_width=None,
+            max_height=None,
+        )
+        first = convert_one(**args)
+        webp_mtime = Path(first["webp"]).stat().st_mtime_ns
+        Path(first["avif"]).unlink()
+        
+        second = convert_one(**args, overwrite=False)
+        
+        assert second == {**first, "skipped": ["webp"]}
+        assert Path(second["webp"]).stat().st_mtime_ns == webp_mtime
+        assert Path(second["avif"]).exists()
+        assert "skipped" not in first
+    
+    def test_convert_one_vips_backend(self, temp_workspace, monkeypatch):
+        """Test conversion through the optional libvips backend."""
+        pytest.importorskip("pyvips")
+        monkeypatch.setenv("IMAGE_CONVERT_BACKEND", "vips")
+        input_path, output_dir = temp_workspace
+        
+        result = convert_one(
+            image_path=input_path,
+            output_dir=output_dir,
+            format="both",
+            webp_quality=80,
+            avif_quality=50,
+            lossless=False,
+            max_width=25,
+            max_height=None,
+        )
+        
+        with Image.open(result["webp"]) as img:
+            assert img.size == (25, 25)
+        with Image.open(result["avif"]) as img:
+            assert img.size == (25, 25)
+    
+    def test_batch_vips_encode_threads(self, temp_workspace, monkeypatch):
+        """Test that a libvips batch caps the thread count and restores it."""
+        pyvips = pytest.importorskip("pyvips")
+        monkeypatch.setenv("IMAGE_CONVERT_BACKEND", "vips")
+        monkeypatch.delenv("IMAGE_CONVERT_EXECUTOR", raising=False)
+        shutdown_pools()
+        input_path, output_dir = temp_workspace
+        args = dict(
+            output_dir=output_dir,
+            format="avif",
+            webp_quality=80,
+            avif_quality=50,
+            lossless=False,
+            max_width=None,
+            max_height=None,
+        )
+        original = pyvips.concurrency_get()
+        pyvips.concurrency_set(3)
+        try:
+            # Single conversions leave the process-wide setting alone
+            convert_one(image_path=input_path, encode_threads=1, **args)
+            assert pyvips.concurrency_get() == 3
+            
+            results = iter_convert_batch(input_path.parent, None, encode_threads=1, **args)
+            assert "error" not in next(results)
+            assert pyvips.concurrency_get() == 1
+            assert list(results) == []
+            assert pyvips.concurrency_get() == 3
+        finally:
+            pyvips.concurrency_set(original)
+
+    def test_convert_bytes(self):
+        """Test in-memory conversion returns encoded bytes."""
+        buf = BytesIO()
+        Image.new("RGB", (40, 40), color="red").save(buf, "PNG")
+        
+        result = convert_bytes(
+            buf.getvalue(),
+            format="both",
+            webp_quality=80,
+            avif_quality=50,
+            lossless=False,
+            max_width=20,
+            max_height=None,
+        )
+        
+        assert set(result) == {"webp", "avif"}
+        assert Image.open(BytesIO(result["webp"])).size == (20, 20)
+        assert Image.open(BytesIO(result["avif"])).format == "AVIF"
+    
+    def test_iter_convert_batch(self, temp_workspace):
+        """Test batch results are yielded per image, including failures."""
+        input_path, output_dir = temp_workspace
+        input_dir = input_path.parent
+        Image.new("RGB", (20, 20), color="green").save(input_dir / "second.png")
+        (input_dir / "broken.png").write_bytes(b"not an image")
+        
+        results = list(iter_convert_batch(
+            input_dir,
+            workers=2,
+            output_dir=output_dir,
+            format="webp",
+            webp_quality=80,
+            avif_quality=50,
+            lossless=False,
+            max_width=None,
+            max_height=None,
+        ))
+        
+        assert len(results) == 3
+        errors = [r for r in results if "error" in r]
+        assert len(errors) == 1
+        assert errors[0]["input"].endswith("broken.png")
+
+    
+    def test_run_in_pool(self, temp_workspace):
+        """Test conversions can be awaited on the shared executor."""
+        input_path, output_dir = temp_workspace
+        
+        result = asyncio.run(run_in_pool(
+            convert_one,
+            image_path=input_path,
+            output_dir=output_dir,
+            format="webp",
+            webp_quality=80,
+            avif_quality=50,
+            lossless=False,
+            max_width=None,
+            max_height=None,
+        ))
+        
+        assert Path(result["webp"]).exists()
+    
+    def test_shutdown_pools_cancels_queued(self, monkeypatch):
+        """Test that shutdown cancels queued work and the pool is recreated."""
+        # The blocking task below is a closure, so use a fresh thread pool
+        monkeypatch.delenv("IMAGE_CONVERT_EXECUTOR", raising=False)
+        shutdown_pools()
+        started = threading.Semaphore(0)
+        release = threading.Event()
+        
+        def block() -> bool:
+            started.release()
+            return release.wait(5)
+        
+        pool = src_core._get_batch_pool()
+        # Occupy every worker so the last task stays queued
+        workers = os.cpu_count() or 1
+        running = [pool.submit(block) for _ in range(workers)]
+        for _ in range(workers):
+            assert started.acquire(timeout=5)
+        queued = pool.submit(int)
+        
+        shutdown_pools()
+        release.set()
+        
+        assert queued.cancelled()
+        assert all(f.result() for f in running)
+        assert src_core._get_batch_pool() is not pool
 
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+"""
+Unit tests for the MCP server tool handlers.
+
+Run with: python -m pytest tests/test_mcp_server.py -v
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from mcp.server.lowlevel.server import request_ctx
+
+import mcp_server
+
+
+def _call_batch(input_dir, output_dir):
+    """Start a convert_image_batch call inside a minimal request context."""
+    request_ctx.set(SimpleNamespace(meta=None, session=None))
+    return asyncio.create_task(mcp_server.call_tool(
+        "convert_image_batch",
+        {"input_path": str(input_dir), "output_dir": str(output_dir)},
+    ))
+
+
+class TestConversionTools:
+    """Test the single and batch conversion tools."""
+
+    def test_batch_reports_progress_and_failures(self, tmp_path, monkeypatch):
+        """Test that the batch result counts images and lists failures."""
+        def fake_batch(input_dir, workers, **kwargs):
+            yield {"input": "a.png", "webp": "a.webp"}
+            yield {"input": "b.png", "error": "broken"}
+            yield {"input": "c.png", "webp": "c.webp", "skipped": ["webp"]}
+
+        monkeypatch.setattr(mcp_server, "iter_convert_batch", fake_batch)
+
+        async def scenario():
+            return await _call_batch(tmp_path, tmp_path / "out")
+
+        [content] = asyncio.run(scenario())
+        assert "3 images processed, 1 failed" in content.text
+        assert "broken" in content.text
+        assert "1 images already up to date" in content.text
+
+    def test_single_reports_skipped_outputs(self, temp_workspace):
+        """Test that up-to-date outputs kept as-is are flagged in the reply."""
+        input_path, output_dir = temp_workspace
+        arguments = {
+            "input_path": str(input_path),
+            "output_dir": str(output_dir),
+            "format": "webp",
+        }
+
+        async def call():
+            request_ctx.set(SimpleNamespace(meta=None, session=None))
+            return await mcp_server.call_tool("convert_image_single", arguments)
+
+        [first] = asyncio.run(call())
+        [second] = asyncio.run(call())
+        assert "not re-encoded" not in first.text
+        assert "Already up to date, not re-encoded: webp" in second.text
+
+    def test_batch_cancellation_propagates(self, tmp_path, monkeypatch):
+        """Test that cancelling mid-batch raises CancelledError and closes the batch."""
+        started = threading.Event()
+        release = threading.Event()
+        closed = threading.Event()
+
+        def fake_batch(input_dir, workers, **kwargs):
+            try:
+                started.set()
+                # Still inside next() in the worker thread when cancelled
+                release.wait(5)
+                yield {"input": "a.png"}
+                yield {"input": "b.png"}
+            finally:
+                closed.set()
+
+        monkeypatch.setattr(mcp_server, "iter_convert_batch", fake_batch)
+
+        async def scenario():
+            task = _call_batch(tmp_path, tmp_path / "out")
+            await asyncio.to_thread(started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            release.set()
+            await asyncio.to_thread(closed.wait, 5)
+
+        asyncio.run(scenario())
+        assert closed.is_set()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -27,12 +27,12 @@ class TestPresets:
             get_preset("nonexistent")
         assert "Unknown preset" in str(exc_info.value)
     
-    def test_get_preset_returns_copy(self):
-        """Ensure get_preset returns a copy, not the original."""
-        preset1 = get_preset("web")
-        preset1["webp_quality"] = 999
-        preset2 = get_preset("web")
-        assert preset2["webp_quality"] == 80
+    def test_get_preset_is_read_only(self):
+        """Ensure presets returned by get_preset cannot be modified."""
+        preset = get_preset("web")
+        with pytest.raises(TypeError):
+            preset["webp_quality"] = 999
+        assert get_preset("web")["webp_quality"] == 80
     
     def test_list_presets(self):
         """Test listing presets with descriptions."""
@@ -52,3 +52,9 @@ class TestPresets:
         preset = get_preset("lossless")
         assert preset["lossless"] is True
         assert preset["format"] == "webp"
+    
+    def test_avif_speed_presets(self):
+        """Verify web favors encode speed and archive favors size."""
+        assert get_preset("web")["avif_speed"] == 6
+        assert get_preset("archive")["avif_speed"] == 2
+        assert "avif_speed" not in get_preset("thumbnail")
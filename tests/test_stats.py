@@ -4,6 +4,8 @@ Tests for stats module.
 from src.stats import (
     format_size,
     calculate_savings,
+    calculate_savings_raw,
+    get_conversion_stats,
     format_stats_summary,
 )
 
@@ -19,11 +21,17 @@ class TestFormatSize:
         """Test KB formatting."""
         assert format_size(1024) == "1.0 KB"
         assert format_size(2560) == "2.5 KB"
+        # Rounds rather than truncates, like float formatting
+        assert format_size(1126) == "1.1 KB"
     
     def test_megabytes(self):
         """Test MB formatting."""
         assert format_size(1024 * 1024) == "1.00 MB"
         assert format_size(2.5 * 1024 * 1024) == "2.50 MB"
+    
+    def test_gigabytes(self):
+        """Test GB formatting."""
+        assert format_size(3 * 1024 ** 3) == "3.00 GB"
 
 
 class TestCalculateSavings:
@@ -45,12 +53,45 @@ class TestCalculateSavings:
         result = calculate_savings(1000, 250)
         assert "4.0:1" in result["compression_ratio"]
     
+    def test_zero_new_size(self):
+        """Test ratio for an empty output file."""
+        result = calculate_savings(1000, 0)
+        assert result["compression_ratio"] == "∞:1"
+        assert result["savings_percent"] == "100.0%"
+    
+    def test_raw_savings(self):
+        """Test unformatted savings values."""
+        assert calculate_savings_raw(1000, 250) == (750, 750, False)
+        assert calculate_savings_raw(3, 2) == (1, 333, False)
+        assert calculate_savings_raw(500, 1000) == (-500, -1000, True)
+    
+    def test_savings_percent_rounding(self):
+        """Test the formatted percentage keeps float rounding."""
+        assert calculate_savings(16, 3)["savings_percent"] == "81.2%"
+        assert calculate_savings(80, 143)["savings_percent"] == "-78.8%"
+    
     def test_zero_original(self):
         """Test handling zero original size."""
         result = calculate_savings(0, 100)
         assert result["savings_percent"] == "0.0%"
 
 
+class TestGetConversionStats:
+    """Test conversion stats collection."""
+    
+    def test_missing_output_is_skipped(self, tmp_path):
+        """Test that outputs which do not exist get no stats."""
+        input_path = tmp_path / "in.png"
+        webp_path = tmp_path / "in.webp"
+        input_path.write_bytes(b"x" * 1000)
+        webp_path.write_bytes(b"x" * 250)
+        
+        stats = get_conversion_stats(input_path, webp_path, tmp_path / "in.avif")
+        assert stats["webp"]["savings_percent"] == "75.0%"
+        assert "avif" not in stats
+        assert stats["best_format"] == "webp"
+
+
 class TestFormatStatsSummary:
     """Test stats summary formatting."""
     
@@ -6,88 +6,104 @@ Run with: python -m pytest tests/test_validation.py -v
 
 import pytest
 from pathlib import Path
-from PIL import Image
+from types import SimpleNamespace
 
 from src import (
     validate_path,
+    validate_file_size,
     validate_image_dimensions,
     validate_params,
     ValidationError,
     MAX_DIMENSION,
+    MAX_FILE_SIZE_MB,
 )
 
 
-class TestValidation:
-    """Test validation functions."""
-    
-    def test_validate_params_missing_input_path(self):
-        """Test that missing input_path raises ValidationError."""
-        with pytest.raises(ValidationError, match="Missing required parameter"):
-            validate_params({})
-    
-    def test_validate_params_invalid_mode(self):
-        """Test that invalid mode raises ValidationError."""
-        with pytest.raises(ValidationError, match="Invalid mode"):
-            validate_params({"input_path": "/tmp/test.png", "mode": "invalid"})
-    
-    def test_validate_params_invalid_format(self):
-        """Test that invalid format raises ValidationError."""
-        with pytest.raises(ValidationError, match="Invalid format"):
-            validate_params({"input_path": "/tmp/test.png", "format": "invalid"})
-    
-    def test_validate_params_invalid_quality(self):
-        """Test that invalid quality raises ValidationError."""
-        with pytest.raises(ValidationError, match="webp_quality must be 1-100"):
-            validate_params({"input_path": "/tmp/test.png", "webp_quality": 150})
-        
-        with pytest.raises(ValidationError, match="avif_quality must be 1-100"):
-            validate_params({"input_path": "/tmp/test.png", "avif_quality": 0})
-    
-    def test_validate_params_valid(self):
-        """Test that valid params don't raise errors."""
-        params = {
-            "input_path": "/tmp/test.png",
-            "mode": "single",
-            "format": "webp",
-            "webp_quality": 80,
-            "avif_quality": 50
-        }
-        # Should not raise
+# Parameter validation
+@pytest.mark.parametrize(
+    "params, match",
+    [
+        ({}, "Missing required parameter"),
+        ({"mode": "invalid"}, "Invalid mode"),
+        ({"format": "invalid"}, "Invalid format"),
+        ({"webp_quality": 150}, "webp_quality must be 1-100"),
+        ({"avif_quality": 0}, "avif_quality must be 1-100"),
+        ({"webp_method": 7}, "webp_method must be 0-6"),
+        ({"avif_speed": -1}, "avif_speed must be 0-10"),
+        ({"avif_codec": "x265"}, "Invalid avif_codec"),
+    ],
+    ids=[
+        "missing-input", "mode", "format", "webp-quality",
+        "avif-quality", "webp-method", "avif-speed", "avif-codec",
+    ],
+)
+
+def test_validate_params_invalid(params, match):
+    """Test that invalid params raise ValidationError."""
+    if params:
+        params = {"input_path": "/tmp/test.png", **params}
+    with pytest.raises(ValidationError, match=match):
         validate_params(params)
 
 
-class TestPathValidation:
-    """Test path validation and security."""
-    
-    def test_validate_path_nonexistent(self):
-        """Test that nonexistent paths raise ValidationError."""
-        with pytest.raises(ValidationError, match="Path does not exist"):
-            validate_path(Path("/nonexistent/path/file.png"), must_exist=True)
-    
-    def test_validate_path_allow_nonexistent(self):
-        """Test that nonexistent paths are allowed when must_exist=False."""
-        # Should not raise
-        path = validate_path(Path("/tmp/new_output"), must_exist=False)
-        assert isinstance(path, Path)
+def test_validate_params_valid():
+    """Test that valid params don't raise errors."""
+    params = {
+        "input_path": "/tmp/test.png",
+        "mode": "single",
+        "format": "webp",
+        "webp_quality": 80,
+        "avif_quality": 50
+    }
+    # Should not raise
+    validate_params(params)
 
 
-class TestSecurityLimits:
-    """Test security and resource limit validations."""
-    
-    def test_validate_image_dimensions_too_large(self):
-        """Test image dimension validation."""
-        # Create oversized image
-        img = Image.new("RGB", (MAX_DIMENSION + 1, 100))
-        
-        with pytest.raises(ValidationError, match="Image dimensions too large"):
-            validate_image_dimensions(img)
+# Path validation and security
+def test_validate_path_nonexistent(tmp_path, monkeypatch):
+    """Test that nonexistent paths raise ValidationError."""
+    monkeypatch.setattr(Path, "exists", lambda self: False)
+    with pytest.raises(ValidationError, match="Path does not exist"):
+        validate_path(tmp_path / "file.png", must_exist=True)
+
+
+def test_validate_path_allow_nonexistent(tmp_path, monkeypatch):
+    """Test that nonexistent paths are allowed when must_exist=False."""
+    monkeypatch.setattr(Path, "exists", lambda self: False)
+    # Should not raise
+    path = validate_path(tmp_path / "new_output", must_exist=False)
+    assert path == tmp_path / "new_output"
+
+
+def test_validate_path_relative_is_resolved():
+    """Test that relative paths and '..' components are resolved."""
+    path = validate_path(Path("tests/../tests"), must_exist=True)
+    assert path.is_absolute()
+    assert ".." not in path.parts
+
+
+# Security and resource limits
+def test_validate_image_dimensions_too_large():
+    """Test image dimension validation."""
+    # Only the size is read, so no pixel buffer is needed
+    img = SimpleNamespace(width=MAX_DIMENSION + 1, height=100)
     
-    def test_validate_image_dimensions_valid(self):
-        """Test valid image dimensions."""
-        img = Image.new("RGB", (1000, 1000))
-        # Should not raise
+    with pytest.raises(ValidationError, match="Image dimensions too large"):
         validate_image_dimensions(img)
 
 
+def test_validate_file_size_known_size():
+    """Test that a pre-computed size is checked without touching the file."""
+    too_large = (MAX_FILE_SIZE_MB + 1) * 1024 * 1024
+    with pytest.raises(ValidationError, match="File too large"):
+        validate_file_size(Path("/nonexistent/file.png"), size_bytes=too_large)
+
+
+def test_validate_image_dimensions_valid(small_image):
+    """Test valid image dimensions."""
+    # Should not raise
+    validate_image_dimensions(small_image)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])